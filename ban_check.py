@@ -3,15 +3,21 @@
 """
 import socket
 import hashlib
-import random
 import aiohttp
 import base64
 import asyncio
 import json
 import os
+from functools import lru_cache
 from urllib.parse import quote
 from typing import Optional, Dict, Tuple, Union
 
+# orjson 序列化比标准库 json 快数倍；缺失时回退到标准库
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 延迟导入 logger，避免循环导入
 _logger = None
 
@@ -32,11 +38,61 @@ BATTLEYE_TIMEOUT = 5
 # 缓存文件路径（将在初始化时设置）
 CACHE_FILE_PATH: Optional[str] = None
 
+# ==================== HTTP 会话管理 ====================
+# 复用单个 ClientSession，避免每次请求都重新建立 DNS/TCP/TLS 连接
+_HTTP_SESSION: Optional[aiohttp.ClientSession] = None
+_SESSION_LOCK = asyncio.Lock()
+# 限制对 sc-cache.com 的并发请求数
+_HTTP_SEMA = asyncio.Semaphore(32)
+
+async def _get_session() -> aiohttp.ClientSession:
+    """获取共享的 aiohttp 会话（懒加载，只创建一次）"""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+        async with _SESSION_LOCK:
+            if _HTTP_SESSION is None or _HTTP_SESSION.closed:
+                _HTTP_SESSION = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(
+                        limit=50,
+                        ttl_dns_cache=300,
+                        keepalive_timeout=60,
+                    ),
+                    timeout=aiohttp.ClientTimeout(total=10),
+                )
+    return _HTTP_SESSION
+
+async def prewarm():
+    """预热到 sc-cache.com 的连接（在插件初始化时后台调用）
+
+    提前完成 DNS 解析和 TLS 握手，让首次真实查询能直接复用
+    keep-alive 连接。失败不影响正常查询。
+    """
+    try:
+        session = await _get_session()
+        async with session.head("https://sc-cache.com/",
+                                timeout=aiohttp.ClientTimeout(total=5)):
+            pass
+    except Exception as e:
+        _get_logger().debug(f"预热 sc-cache.com 连接失败（不影响查询）: {e}")
+
+async def close_session():
+    """关闭共享的 aiohttp 会话（在插件销毁时调用）"""
+    global _HTTP_SESSION
+    if _HTTP_SESSION is not None and not _HTTP_SESSION.closed:
+        await _HTTP_SESSION.close()
+    _HTTP_SESSION = None
+
 # ==================== 缓存管理 ====================
 # 缓存配置 - RID是永久性的，不需要过期时间
-RID_CACHE: Dict[str, str] = {}  # {identifier: rid}
-# 使用 asyncio.Lock 替代 threading.RLock，因为现在是完全异步的
-CACHE_LOCK = asyncio.Lock()
+# 值为 (rid, be_id)：BE ID 由 RID 唯一确定，插入时算好并编码为 ASCII 字节，
+# 发送时只需拼接 4 字节请求头，命中路径不再有 MD5 和编码开销
+RID_CACHE: Dict[str, Tuple[str, bytes]] = {}  # {identifier: (rid, be_id_bytes)}
+# 缓存无需锁：条目只增不改、值不可变，所有用到的 dict 操作
+# （get/设值/pop/clear/len/items）在 GIL 下都是原子的
+
+# 正在进行中的查询（single-flight）：相同标识符的并发查询共享同一个 Future，
+# 避免对 sc-cache.com 和 BattlEye 服务器发起重复请求
+_INFLIGHT: Dict[str, asyncio.Future] = {}
 
 def set_cache_file_path(file_path: str):
     """设置缓存文件路径"""
@@ -49,9 +105,12 @@ def load_cache_from_file() -> Dict[str, str]:
         return {}
     
     try:
-        with open(CACHE_FILE_PATH, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except json.JSONDecodeError as e:
+        with open(CACHE_FILE_PATH, 'rb') as f:
+            raw = f.read()
+        if orjson is not None:
+            return orjson.loads(raw)
+        return json.loads(raw)
+    except ValueError as e:
         _get_logger().warning(f"缓存文件 JSON 格式错误: {e}，将使用空缓存")
         return {}
     except PermissionError as e:
@@ -64,21 +123,60 @@ def load_cache_from_file() -> Dict[str, str]:
         _get_logger().error(f"加载缓存时发生未知错误: {e}", exc_info=True)
         return {}
 
+# 缓存落盘的防抖机制：插入只标记脏位，由后台任务合并多次写入后统一落盘
+_DIRTY = asyncio.Event()
+_FLUSH_DELAY = 2.0  # 标记脏位后等待的合并窗口（秒）
+_FLUSHER_TASK: Optional[asyncio.Task] = None
+
+async def _flusher():
+    """后台落盘任务：等待脏位被置位，延迟一小段时间合并后续写入，再统一保存"""
+    while True:
+        await _DIRTY.wait()
+        _DIRTY.clear()
+        await asyncio.sleep(_FLUSH_DELAY)
+        await save_cache_to_file()
+
 async def init_cache(cached_data: Dict[str, str]):
-    """初始化缓存（接口函数，用于封装）"""
-    async with CACHE_LOCK:
-        RID_CACHE.update(cached_data)
+    """初始化缓存（接口函数，用于封装）
 
-async def get_cache_stats() -> Tuple[int, list]:
+    磁盘上的缓存只存 {identifier: rid}，加载时重新派生 BE ID。
+    """
+    global _FLUSHER_TASK
+    entries: Dict[str, Tuple[str, bytes]] = {}
+    for identifier, rid in cached_data.items():
+        try:
+            entries[identifier] = (rid, _be_id_bytes(int(rid)))
+        except (TypeError, ValueError):
+            # 跳过损坏的条目（RID 不是数字）
+            continue
+    RID_CACHE.update(entries)
+    # 启动后台落盘任务（只启动一次）
+    if _FLUSHER_TASK is None or _FLUSHER_TASK.done():
+        _FLUSHER_TASK = asyncio.create_task(_flusher())
+
+async def stop_flusher():
+    """停止后台落盘任务并做最后一次保存（在插件销毁时调用）"""
+    global _FLUSHER_TASK
+    if _FLUSHER_TASK is not None:
+        _FLUSHER_TASK.cancel()
+        try:
+            await _FLUSHER_TASK
+        except asyncio.CancelledError:
+            pass
+        _FLUSHER_TASK = None
+    # 无条件做最后一次落盘：脏位在合并窗口开始时就被清除，
+    # 若恰好在窗口内取消任务，仅凭脏位会漏掉尚未保存的写入
+    _DIRTY.clear()
+    await save_cache_to_file()
+
+def get_cache_stats() -> Tuple[int, list]:
     """获取缓存统计信息（接口函数，用于封装）
-    
+
     Returns:
         (缓存大小, 缓存条目列表（最多10个）)
     """
-    async with CACHE_LOCK:
-        cache_size = len(RID_CACHE)
-        cache_items = list(RID_CACHE.items())[:10]
-        return cache_size, cache_items
+    cache_items = [(identifier, entry[0]) for identifier, entry in list(RID_CACHE.items())[:10]]
+    return len(RID_CACHE), cache_items
 
 async def save_cache_to_file():
     """保存缓存到文件（异步版本）"""
@@ -89,9 +187,18 @@ async def save_cache_to_file():
         # 使用 asyncio.to_thread 将文件操作放到线程池执行，避免阻塞
         def _save():
             os.makedirs(os.path.dirname(CACHE_FILE_PATH), exist_ok=True)
-            with open(CACHE_FILE_PATH, 'w', encoding='utf-8') as f:
-                json.dump(RID_CACHE, f, ensure_ascii=False, indent=2)
-        
+            # 只持久化 {identifier: rid}，BE ID 在加载时重新派生（保持文件格式兼容）
+            snapshot = {identifier: entry[0] for identifier, entry in RID_CACHE.items()}
+            if orjson is not None:
+                data = orjson.dumps(snapshot, option=orjson.OPT_INDENT_2)
+            else:
+                data = json.dumps(snapshot, ensure_ascii=False, indent=2).encode('utf-8')
+            # 先写临时文件再原子替换，避免崩溃时留下写了一半的缓存文件
+            tmp_path = CACHE_FILE_PATH + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, CACHE_FILE_PATH)
+
         await asyncio.to_thread(_save)
     except PermissionError as e:
         _get_logger().error(f"无法保存缓存文件（权限不足）: {e}")
@@ -100,143 +207,147 @@ async def save_cache_to_file():
     except Exception as e:
         _get_logger().error(f"保存缓存时发生未知错误: {e}", exc_info=True)
 
+@lru_cache(maxsize=4096)
 def compute_be_id(rid: int) -> str:
-    """计算 BattlEye ID（与原C#代码完全一致）"""
-    # 1. 将rid转为字符串
-    rid_str = str(rid)
-    
-    # 2. 将字符串转为UTF-8字节，然后转为Base64
-    rid_bytes = rid_str.encode('utf-8')
-    rid_base64 = base64.b64encode(rid_bytes).decode('ascii')
-    
-    # 3. 拼接"BE"前缀
-    data = "BE" + rid_base64
-    
-    # 4. 计算MD5
-    md5_hash = hashlib.md5(data.encode('ascii')).hexdigest()
-    
-    return md5_hash.lower()
+    """计算 BattlEye ID（与原C#代码完全一致）
+
+    算法：md5("BE" + base64(str(rid)))，全程在 bytes 上操作，
+    避免中间的 str 拼接和重复编码。纯函数，结果按RID做LRU缓存，
+    反复查询同一RID时退化为一次字典查找。
+    """
+    rid_base64 = base64.b64encode(str(rid).encode('ascii'))
+    # MD5 仅用作标识派生，非安全用途（允许走更快的 OpenSSL 路径）
+    return hashlib.md5(b"BE" + rid_base64, usedforsecurity=False).hexdigest()
+
+def _be_id_bytes(rid_int: int) -> bytes:
+    """计算可直接拼进 UDP 包的 BE ID ASCII 字节"""
+    return compute_be_id(rid_int).encode('ascii')
 
 def _decode_ban_data(ban_data: bytes) -> str:
-    """解码封禁数据，尝试多种编码方式"""
-    # 按优先级尝试不同的编码方式
-    encodings = ['ascii', 'utf-8', 'latin-1']
-    
-    for encoding in encodings:
-        try:
-            result = ban_data.decode(encoding, errors='replace').strip()
-            if result:
-                return result
-        except Exception:
-            continue
-    
-    # 如果所有编码都失败，返回十六进制表示
-    return ban_data.hex()
+    """解码封禁数据
+
+    UTF-8 + errors='replace' 不会抛异常且完整覆盖 ASCII 响应；
+    解码结果为空白时退回十六进制表示。
+    """
+    return ban_data.decode('utf-8', errors='replace').strip() or ban_data.hex()
+
+# ==================== BattlEye UDP 查询 ====================
+# 复用单个 UDP socket，按 4 字节请求ID把响应分发给对应的查询，
+# 避免每次查询都创建/销毁一个 datagram endpoint
+_UDP_TRANSPORT: Optional[asyncio.DatagramTransport] = None
+_UDP_LOCK = asyncio.Lock()
+_PENDING: Dict[bytes, asyncio.Future] = {}  # {请求ID: 等待响应的Future}
+# 限制对 BattlEye 服务器的并发查询数，避免突发流量触发限流/超时
+_BE_SEMA = asyncio.Semaphore(16)
+_NEXT_REQUEST_ID = int.from_bytes(os.urandom(4), 'big')  # 随机起点，单调递增
 
 class _BattlEyeProtocol(asyncio.DatagramProtocol):
-    """BattlEye UDP 协议处理器"""
-    def __init__(self):
-        self.transport = None
-        self.response = None
-        self.future = asyncio.Future()
-    
-    def connection_made(self, transport):
-        self.transport = transport
-    
+    """BattlEye UDP 协议处理器：共享 socket 的响应分发器"""
     def datagram_received(self, data, addr):
-        if not self.future.done():
-            self.response = data
-            self.future.set_result(data)
-            if self.transport:
-                self.transport.close()
-    
+        # 按前4字节请求ID找到等待中的查询
+        fut = _PENDING.pop(data[:4], None)
+        if fut is not None and not fut.done():
+            fut.set_result(data[4:])
+
     def error_received(self, exc):
-        if not self.future.done():
-            self.future.set_exception(exc)
-            if self.transport:
-                self.transport.close()
-    
+        # socket 级别错误，让所有等待中的查询立即失败
+        while _PENDING:
+            _, fut = _PENDING.popitem()
+            if not fut.done():
+                fut.set_exception(exc)
+
     def connection_lost(self, exc):
-        if not self.future.done() and exc is None:
-            # 连接正常关闭但没有收到响应
-            if self.response is None:
-                self.future.set_exception(asyncio.TimeoutError("未收到响应"))
-
-async def check_ban_reason(rid: int) -> str:
-    """查询BattlEye封禁状态（异步版本，使用原生异步 UDP）"""
-    transport = None
+        global _UDP_TRANSPORT
+        _UDP_TRANSPORT = None
+        err = exc if exc is not None else ConnectionResetError("UDP 连接已关闭")
+        while _PENDING:
+            _, fut = _PENDING.popitem()
+            if not fut.done():
+                fut.set_exception(err)
+
+def _next_request_id() -> bytes:
+    """分配下一个 4 字节请求ID（单调递增，32位回绕）"""
+    global _NEXT_REQUEST_ID
+    _NEXT_REQUEST_ID = (_NEXT_REQUEST_ID + 1) & 0xFFFFFFFF
+    return _NEXT_REQUEST_ID.to_bytes(4, 'big')
+
+async def _get_udp_transport() -> asyncio.DatagramTransport:
+    """获取共享的 UDP transport（懒加载，只创建一次）"""
+    global _UDP_TRANSPORT
+    if _UDP_TRANSPORT is None or _UDP_TRANSPORT.is_closing():
+        async with _UDP_LOCK:
+            if _UDP_TRANSPORT is None or _UDP_TRANSPORT.is_closing():
+                loop = asyncio.get_running_loop()
+                _UDP_TRANSPORT, _ = await loop.create_datagram_endpoint(
+                    _BattlEyeProtocol,
+                    family=socket.AF_INET
+                )
+    return _UDP_TRANSPORT
+
+async def close_udp():
+    """关闭共享的 UDP transport（在插件销毁时调用）"""
+    global _UDP_TRANSPORT
+    if _UDP_TRANSPORT is not None and not _UDP_TRANSPORT.is_closing():
+        _UDP_TRANSPORT.close()
+    _UDP_TRANSPORT = None
+
+async def check_ban_reason(be_id: bytes) -> str:
+    """查询BattlEye封禁状态（异步版本，共享 UDP socket）
+
+    Args:
+        be_id: 预先算好的 BE ID ASCII 字节（见 _be_id_bytes）
+    """
     try:
         loop = asyncio.get_running_loop()
-        server_address = (BATTLEYE_SERVER_HOST, BATTLEYE_SERVER_PORT)
-        
-        # 生成随机头部数据（4字节）
-        header = bytes([random.randint(0, 255) for _ in range(4)])
-        
-        # 计算BE ID
-        be_id = compute_be_id(rid)
-        
-        # 构建发送数据：4字节随机头部 + BE ID
-        data_to_send = header + be_id.encode('ascii')
-        
-        # 创建协议实例
-        protocol = _BattlEyeProtocol()
-        
-        # 创建异步 UDP 端点（绑定到本地任意端口）
-        transport, _ = await loop.create_datagram_endpoint(
-            lambda: protocol,
-            family=socket.AF_INET
-        )
-        
-        # 发送数据
-        transport.sendto(data_to_send, server_address)
-        
+        transport = await _get_udp_transport()
+
+        # 分配请求ID并注册等待的Future
+        header = _next_request_id()
+        fut = loop.create_future()
+        _PENDING[header] = fut
+
         try:
-            # 等待响应（带超时）
-            response = await asyncio.wait_for(
-                protocol.future,
-                timeout=BATTLEYE_TIMEOUT
-            )
-            
-            # 跳过前4字节头部，返回封禁原因
-            if len(response) > 4:
-                ban_data = response[4:]
-                return _decode_ban_data(ban_data)
-            return ""
+            async with _BE_SEMA:
+                # 构建发送数据：4字节请求ID + BE ID（字节已预先算好，纯拼接）
+                transport.sendto(header + be_id,
+                                 (BATTLEYE_SERVER_HOST, BATTLEYE_SERVER_PORT))
+                # 等待响应（带超时），响应已由协议层去掉4字节头部
+                ban_data = await asyncio.wait_for(fut, timeout=BATTLEYE_TIMEOUT)
         except asyncio.TimeoutError:
             return "查询超时"
         finally:
-            if transport and not transport.is_closing():
-                transport.close()
-        
+            _PENDING.pop(header, None)
+
+        if ban_data:
+            return _decode_ban_data(ban_data)
+        return ""
+
     except Exception as e:
         _get_logger().error(f"查询封禁状态时发生错误: {e}", exc_info=True)
-        if transport and not transport.is_closing():
-            transport.close()
         return f"查询错误: {str(e)}"
 
-async def get_rid_from_cache(identifier: str) -> Optional[str]:
-    """从缓存获取RID（异步版本）"""
-    async with CACHE_LOCK:
-        return RID_CACHE.get(identifier)
+def get_rid_from_cache(identifier: str) -> Optional[Tuple[str, bytes]]:
+    """从缓存获取 (rid, be_id)（无锁读取，dict.get 在 GIL 下是原子操作）"""
+    return RID_CACHE.get(identifier)
 
-async def add_rid_to_cache(identifier: str, rid: str):
-    """添加RID到缓存（永不过期，异步版本）"""
-    async with CACHE_LOCK:
-        RID_CACHE[identifier] = rid
-        await save_cache_to_file()  # 异步持久化缓存
+def add_rid_to_cache(identifier: str, rid: str):
+    """添加RID到缓存（永不过期，落盘由后台任务合并执行）
 
-async def remove_from_cache(identifier: str):
-    """从缓存中移除指定项（异步版本）"""
-    async with CACHE_LOCK:
-        RID_CACHE.pop(identifier, None)
+    BE ID 在插入时一次算好，后续命中直接复用。
+    """
+    RID_CACHE[identifier] = (rid, _be_id_bytes(int(rid)))
+    _DIRTY.set()  # 标记脏位，由后台任务合并落盘
+
+def remove_from_cache(identifier: str):
+    """从缓存中移除指定项（dict.pop 在 GIL 下是原子操作）"""
+    RID_CACHE.pop(identifier, None)
 
 async def clear_cache() -> int:
     """清空缓存（异步版本）"""
-    async with CACHE_LOCK:
-        cache_size = len(RID_CACHE)
-        RID_CACHE.clear()
-        await save_cache_to_file()  # 异步持久化清空操作
-        return cache_size
+    cache_size = len(RID_CACHE)
+    RID_CACHE.clear()
+    await save_cache_to_file()  # 异步持久化清空操作
+    return cache_size
 
 async def get_rid_from_name(username: str) -> Optional[str]:
     """从用户名获取RID（异步版本，使用 aiohttp）"""
@@ -246,9 +357,10 @@ async def get_rid_from_name(username: str) -> Optional[str]:
         url = f"https://sc-cache.com/n/{encoded_username}"
         headers = {'User-Agent': 'Mozilla/5.0'}
         
-        # 使用 aiohttp 进行异步 HTTP 请求
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=10)) as response:
+        # 使用共享的 aiohttp 会话进行异步 HTTP 请求（复用连接，限制并发）
+        session = await _get_session()
+        async with _HTTP_SEMA:
+            async with session.get(url, headers=headers) as response:
                 if response.status == 200:
                     data = await response.json()
                     if "id" in data:
@@ -264,63 +376,87 @@ async def get_rid_from_name(username: str) -> Optional[str]:
 
 async def check_ban_async(identifier: Union[str, int], use_cache: bool = True) -> Tuple[bool, str]:
     """检查封禁状态 - 完全异步版本
-    
+
     Args:
         identifier: 用户名或RID（可以是字符串或整数）
         use_cache: 是否使用缓存，默认为True
-        
+
     Returns:
         (是否成功, 结果消息)
     """
     # 统一转换为字符串处理
     identifier_str = str(identifier)
-    
-    # 1. 首先尝试从缓存获取
+
+    # 强制查询不走合并逻辑，每次都真实发起请求
+    if not use_cache:
+        return await _check_ban_impl(identifier_str, use_cache)
+
+    # single-flight：相同标识符的并发查询等待同一个进行中的结果
+    fut = _INFLIGHT.get(identifier_str)
+    if fut is not None:
+        return await fut
+
+    loop = asyncio.get_running_loop()
+    fut = loop.create_future()
+    _INFLIGHT[identifier_str] = fut
+    try:
+        result = await _check_ban_impl(identifier_str, use_cache)
+        fut.set_result(result)
+        return result
+    except BaseException as e:
+        fut.set_exception(e)
+        raise
+    finally:
+        _INFLIGHT.pop(identifier_str, None)
+
+# 结果消息模板（绑定方法，避免每次查询都重新解析格式字符串）
+_OK_TMPL = "{} (RID: {}) 没有被封禁".format
+_BAN_TMPL = "{} (RID: {}) 已被封禁 - 返回信息: {}".format
+
+async def _query_ban_status(identifier_str: str, rid: str, be_id: bytes) -> Tuple[bool, str]:
+    """用算好的 BE ID 查询封禁状态并格式化结果消息"""
+    try:
+        ban_reason = await check_ban_reason(be_id)
+
+        if not ban_reason:
+            return True, _OK_TMPL(identifier_str, rid)
+        else:
+            return True, _BAN_TMPL(identifier_str, rid, ban_reason)
+    except Exception as e:
+        return False, f"错误: {str(e)}"
+
+async def _check_by_rid(identifier_str: str, rid: str, rid_int: int) -> Tuple[bool, str]:
+    """用已解析的RID直接查询封禁状态"""
+    return await _query_ban_status(identifier_str, rid, _be_id_bytes(rid_int))
+
+async def _check_ban_impl(identifier_str: str, use_cache: bool) -> Tuple[bool, str]:
+    """实际执行封禁查询的内部实现"""
+    # 1. 纯数字标识符本身就是RID，直接查询，无需查缓存
+    #    一次 int() 解析同时完成"是否数字"判断和数值转换
+    try:
+        rid_int = int(identifier_str, 10)
+    except ValueError:
+        rid_int = None
+    if rid_int is not None and rid_int >= 0:
+        return await _check_by_rid(identifier_str, identifier_str, rid_int)
+
+    # 2. 尝试从缓存获取（命中时直接复用算好的 BE ID）
     if use_cache:
-        cached_rid = await get_rid_from_cache(identifier_str)
-        if cached_rid:
-            rid = cached_rid
-            # 直接使用缓存的RID查询封禁状态
-            try:
-                rid_int = int(rid)
-                ban_reason = await check_ban_reason(rid_int)
-                
-                if not ban_reason:
-                    return True, f"{identifier_str} (RID: {rid}) 没有被封禁"
-                else:
-                    return True, f"{identifier_str} (RID: {rid}) 已被封禁 - 返回信息: {ban_reason}"
-            except ValueError:
-                # 如果RID无效，从缓存中移除并重新获取
-                await remove_from_cache(identifier_str)
-            except Exception as e:
-                return False, f"错误: {str(e)}"
-    
-    # 2. 缓存未命中或禁用缓存，尝试获取RID
-    # 首先检查identifier是否已经是RID（纯数字）
-    if identifier_str.isdigit():
-        rid = identifier_str
-    else:
-        # 尝试从用户名获取（使用 sc-cache.com，异步）
-        rid = await get_rid_from_name(identifier_str)
-    
+        cached_entry = get_rid_from_cache(identifier_str)
+        if cached_entry:
+            rid, be_id = cached_entry
+            return await _query_ban_status(identifier_str, rid, be_id)
+
+    # 3. 缓存未命中或禁用缓存，从用户名获取RID（使用 sc-cache.com，异步）
+    rid = await get_rid_from_name(identifier_str)
     if not rid:
         return False, f"错误: 无法获取 {identifier_str} 的RID"
-    
-    # 3. 添加到缓存（如果启用缓存）
-    if use_cache:
-        await add_rid_to_cache(identifier_str, rid)
-    
-    # 4. 查询封禁状态
     try:
-        rid_int = int(rid)
-        ban_reason = await check_ban_reason(rid_int)
-        
-        if not ban_reason:
-            return True, f"{identifier_str} (RID: {rid}) 没有被封禁"
-        else:
-            return True, f"{identifier_str} (RID: {rid}) 已被封禁 - 返回信息: {ban_reason}"
-                
+        rid_int = int(rid, 10)
     except ValueError:
         return False, f"错误: 无效的RID {rid}"
-    except Exception as e:
-        return False, f"错误: {str(e)}"
+
+    # 4. 添加到缓存（如果启用缓存），再查询封禁状态
+    if use_cache:
+        add_rid_to_cache(identifier_str, rid)
+    return await _check_by_rid(identifier_str, rid, rid_int)
@@ -2,6 +2,7 @@
 封禁检查插件 - 查询GTA玩家BattlEye封禁状态
 命令: /查封禁 <用户名/RID>
 """
+import asyncio
 from astrbot.api.event import filter, AstrMessageEvent
 from astrbot.api.star import Context, Star, register, StarTools
 from astrbot.api import logger, llm_tool
@@ -32,6 +33,9 @@ class BanCheckerPlugin(Star):
         self.context.activate_llm_tool("check_ban_status")
         self.context.activate_llm_tool("force_check_ban_status")
 
+        # 后台预热到 sc-cache.com 的连接，降低首次查询延迟
+        self._prewarm_task = asyncio.create_task(ban_check.prewarm())
+
     async def _handle_check_ban(self, event: AstrMessageEvent, identifier: Optional[Union[str, int]], use_cache: bool, loading_msg: str):
         """处理封禁查询的公共方法"""
         if not identifier:
@@ -85,7 +89,7 @@ class BanCheckerPlugin(Star):
     async def cache_status(self, event: AstrMessageEvent):
         """查看当前缓存状态"""
         # 使用接口函数获取缓存状态
-        cache_size, cache_items = await ban_check.get_cache_stats()
+        cache_size, cache_items = ban_check.get_cache_stats()
         
         status_msg = f"📊 缓存状态\n"
         status_msg += f"缓存条目数: {cache_size}\n\n"
@@ -113,6 +117,19 @@ class BanCheckerPlugin(Star):
 
     async def terminate(self):
         """插件销毁方法"""
+        # 先取消预热任务，避免它在会话关闭后又创建新的连接
+        prewarm_task = getattr(self, "_prewarm_task", None)
+        if prewarm_task is not None:
+            prewarm_task.cancel()
+            try:
+                await prewarm_task
+            except asyncio.CancelledError:
+                pass
+        # 停止后台落盘任务并做最后一次保存
+        await ban_check.stop_flusher()
+        # 关闭共享的 HTTP 会话和 UDP socket
+        await ban_check.close_session()
+        await ban_check.close_udp()
         logger.info("封禁检查插件已卸载")
 
     # ------------------------- LLM 函数工具 -------------------------